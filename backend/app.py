@@ -1,12 +1,25 @@
-from fastapi import FastAPI, HTTPException, Query
+from contextlib import asynccontextmanager
+import json
+import anyio
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional
+from fastapi.responses import StreamingResponse
+from typing import Iterator, List, Optional
 import uvicorn
 
-from models import SearchResult, AskResponse
+from models import SearchResult, SearchResultList, AskResponse
 from rag import RAGPipeline
 
-app = FastAPI(title="Startup Discovery API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Initialize RAG pipeline once per worker, after uvicorn has forked it
+    app.state.rag = RAGPipeline()
+    # Search and Q&A block on OpenAI and FAISS in worker threads; allow more than the default 40
+    anyio.to_thread.current_default_thread_limiter().total_tokens = 100
+    yield
+
+app = FastAPI(title="Startup Discovery API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -17,38 +30,58 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize RAG pipeline
-rag_pipeline = RAGPipeline()
-
 @app.get("/")
 async def root():
     return {"message": "Startup Discovery API - Use /search or /ask endpoints"}
 
 @app.get("/search", response_model=List[SearchResult])
-async def search_startups(q: str = Query(..., description="Search query")):
+async def search_startups(request: Request, q: str = Query(..., description="Search query")):
     """
     Semantic search for startups based on natural language query.
     """
     try:
-        results = rag_pipeline.search(q)
-        return results
+        results = await run_in_threadpool(request.app.state.rag.search, q)
+        # Serialize directly; response_model is kept for the OpenAPI schema
+        content = SearchResultList.dump_json(SearchResultList.validate_python(results))
+        return Response(content=content, media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
 @app.get("/ask", response_model=AskResponse)
-async def ask_about_startups(q: str = Query(..., description="Question about startups")):
+async def ask_about_startups(request: Request, q: str = Query(..., description="Question about startups")):
     """
     Get LLM-powered answer about startups based on retrieved data.
     """
     try:
-        answer = rag_pipeline.ask(q)
+        answer = await run_in_threadpool(request.app.state.rag.ask, q)
         return AskResponse(question=q, answer=answer)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Q&A failed: {str(e)}")
 
+def _sse_events(first: Optional[str], chunks: Iterator[str]) -> Iterator[str]:
+    """Frame answer chunks as server-sent events, JSON-encoded so newlines survive."""
+    if first is not None:
+        yield f"data: {json.dumps(first)}\n\n"
+        for chunk in chunks:
+            yield f"data: {json.dumps(chunk)}\n\n"
+    yield "event: done\ndata: {}\n\n"
+
+@app.get("/ask/stream")
+async def ask_about_startups_stream(request: Request, q: str = Query(..., description="Question about startups")):
+    """
+    Stream the LLM-powered answer as server-sent events while it is generated.
+    """
+    chunks = request.app.state.rag.ask_stream(q)
+    try:
+        # Retrieval and the first token happen before headers are sent, so failures still return 500
+        first = await run_in_threadpool(next, chunks, None)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Q&A failed: {str(e)}")
+    return StreamingResponse(_sse_events(first, chunks), media_type="text/event-stream")
+
 @app.get("/health")
-async def health_check():
-    return {"status": "healthy", "index_loaded": rag_pipeline.is_index_loaded()}
+async def health_check(request: Request):
+    return {"status": "healthy", "index_loaded": request.app.state.rag.is_index_loaded()}
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,24 +1,54 @@
-import pandas as pd
 import numpy as np
+import csv
 import json
 import os
-import hashlib
+import asyncio
+import base64
+import random
+import math
 import time
 from datetime import datetime, timezone
+from operator import itemgetter
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import openai
 from dotenv import load_dotenv
 import faiss
-import requests
+import httpx
+import xxhash
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
 from apscheduler.schedulers.background import BackgroundScheduler
 
 # Load environment variables
 load_dotenv()
 
+EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+# text-embedding-3 models can return shortened vectors; ada-002 is fixed at 1536
+if EMBEDDING_MODEL.startswith("text-embedding-3"):
+    EMBEDDING_DIM = int(os.getenv("OPENAI_EMBEDDING_DIMENSIONS", "512"))
+    EMBEDDING_OPTIONS = {"dimensions": EMBEDDING_DIM}
+else:
+    EMBEDDING_DIM = 1536
+    EMBEDDING_OPTIONS = {}
+# OpenAI accepts up to 2048 inputs per embeddings request
+EMBEDDING_BATCH_SIZE = 1024
+EMBEDDING_CONCURRENCY = 5  # Max embedding requests in flight
+# Below this many vectors a flat index beats IVF (and IVF/PQ training needs enough points)
+IVF_MIN_VECTORS = 10_000
+# From this many vectors on, IVF cells store PQ codes instead of full vectors
+PQ_MIN_VECTORS = 100_000
+
+CRUNCHBASE_SEARCH_URL = "https://api.crunchbase.com/api/v4/searches/organizations"
+CRUNCHBASE_MIN_FOUNDED_YEAR = 2015
+CRUNCHBASE_CONCURRENCY = 4  # Max Crunchbase requests in flight
+
+# Fields joined into the text that gets embedded
+_search_text_fields = itemgetter("name", "description", "industry", "location")
+
 class StartupIngester:
     def __init__(self):
-        self.openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         self.crunchbase_key = os.getenv("CRUNCHBASE_API_KEY")
         self.index_dir = Path("index")
         self.data_dir = Path("data")
@@ -29,9 +59,13 @@ class StartupIngester:
         self.data_dir.mkdir(exist_ok=True)
         self.cache_dir.mkdir(exist_ok=True)
         
-        # Initialize scheduler for background updates
-        self.scheduler = BackgroundScheduler()
-        self.scheduler.add_job(self.run_scheduled_update, 'interval', hours=12, coalesce=True, misfire_grace_time=3600)
+        # Embeddings keyed by content hash, so unchanged startups aren't re-embedded
+        self.embed_cache_path = self.cache_dir / "embeddings.npz"
+        self.embed_cache = self.load_embedding_cache()
+        
+        # Background scheduler is only created by start_background_updates, so
+        # importing or constructing the ingester never starts periodic jobs
+        self.scheduler: Optional[BackgroundScheduler] = None
         
     def load_sync_state(self) -> Dict[str, Any]:
         """Load synchronization state from file."""
@@ -57,53 +91,68 @@ class StartupIngester:
             print("⚠️  No Crunchbase API key found. Using fallback data sources.")
             return self.fetch_startups_from_web()
         
-        startups = []
-        page = 1
-        
         try:
-            while len(startups) < limit:
-                url = "https://api.crunchbase.com/api/v4/searches/organizations"
-                headers = {"X-cb-user-key": self.crunchbase_key}
-                
-                # v4 API uses POST with JSON body
-                payload = {
-                    "field_values": [
-                        {"field_id": "organization_types", "values": ["company"]},
-                        {"field_id": "founded_on_year", "values": [{"value": 2015, "operator": "gte"}]}
-                    ],
-                    "limit": min(50, limit - len(startups)),
-                    "order": [{"field_id": "founded_on_year", "sort": "desc"}]
-                }
-                
-                print(f"Fetching page {page} from Crunchbase v4...")
-                response = requests.post(url, headers=headers, json=payload, timeout=30)
-                
-                if response.status_code == 429:
-                    print("⚠️  Rate limit hit. Waiting 60 seconds...")
-                    time.sleep(60)
-                    continue
-                elif response.status_code != 200:
-                    print(f"❌ Crunchbase API error: {response.status_code} - {response.text[:200]}")
-                    break
-                
-                data = response.json()
-                items = data.get("entities", [])
-                
-                if not items:
-                    break
-                
-                for org in items:
-                    startup = self._parse_crunchbase_v4_org(org)
-                    if startup:
-                        startups.append(startup)
-                
-                page += 1
-                time.sleep(1)  # Respect rate limits
-                
+            return asyncio.run(self._fetch_crunchbase_years(limit))
         except Exception as e:
             print(f"❌ Error fetching from Crunchbase: {e}")
+            return []
+    
+    async def _fetch_crunchbase_years(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        Query every founding year concurrently over one HTTP/2 connection.
         
-        return startups
+        Year ranges are disjoint, so the requests don't depend on each other's
+        paging cursor and can all be in flight at once.
+        """
+        years = range(datetime.now(timezone.utc).year, CRUNCHBASE_MIN_FOUNDED_YEAR - 1, -1)
+        semaphore = asyncio.Semaphore(CRUNCHBASE_CONCURRENCY)  # Respect rate limits
+        headers = {"X-cb-user-key": self.crunchbase_key}
+        
+        async with httpx.AsyncClient(http2=True, headers=headers, timeout=30) as client:
+            pages = await asyncio.gather(*(
+                self._fetch_crunchbase_year(client, semaphore, year, min(50, limit))
+                for year in years
+            ))
+        
+        # Newest founding years first
+        startups = [startup for page in pages for startup in page]
+        return startups[:limit]
+    
+    async def _fetch_crunchbase_year(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                                     year: int, limit: int) -> List[Dict[str, Any]]:
+        """Fetch up to limit companies founded in the given year."""
+        # v4 API uses POST with JSON body
+        payload = {
+            "field_values": [
+                {"field_id": "organization_types", "values": ["company"]},
+                {"field_id": "founded_on_year", "values": [{"value": year, "operator": "eq"}]}
+            ],
+            "limit": limit
+        }
+        
+        for attempt in range(3):  # Try up to 3 times
+            try:
+                async with semaphore:
+                    print(f"Fetching companies founded in {year} from Crunchbase v4...")
+                    response = await client.post(CRUNCHBASE_SEARCH_URL, json=payload)
+            except httpx.HTTPError as e:
+                # Lose only this year; the other years' results are still usable
+                print(f"❌ Crunchbase request for {year} failed: {e}")
+                break
+            
+            if response.status_code == 429:
+                print("⚠️  Rate limit hit. Waiting 60 seconds...")
+                await asyncio.sleep(60)
+                continue
+            elif response.status_code != 200:
+                print(f"❌ Crunchbase API error: {response.status_code} - {response.text[:200]}")
+                break
+            
+            items = response.json().get("entities", [])
+            startups = (self._parse_crunchbase_v4_org(org) for org in items)
+            return [startup for startup in startups if startup]
+        
+        return []
     
     def _parse_crunchbase_v4_org(self, org: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Parse Crunchbase v4 organization data into our format."""
@@ -223,10 +272,19 @@ class StartupIngester:
         except:
             return 50
     
+    def _hash_file(self, path: Path) -> str:
+        """Hash a file in chunks, without holding it in memory."""
+        hasher = xxhash.xxh3_64()
+        with open(path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+    
     def _generate_content_hash(self, name: str, description: str, industry: str, location: str) -> str:
         """Generate hash of content for change detection."""
         content = f"{name} {description} {industry} {location}".lower()
-        return hashlib.sha256(content.encode()).hexdigest()
+        # Change detection only, no adversary: a fast 128-bit non-cryptographic hash is enough
+        return xxhash.xxh3_128(content.encode()).hexdigest()
     
     def fetch_startups_from_web(self) -> List[Dict[str, Any]]:
         """Fallback: Scrape startup data from web sources."""
@@ -250,18 +308,18 @@ class StartupIngester:
             csv_path = self.data_dir / "startups.csv"
             if csv_path.exists():
                 print("📁 Loading startup data from startups.csv...")
-                df = pd.read_csv(csv_path)
-                startups = []
+                with open(csv_path, newline="") as f:
+                    rows = list(csv.DictReader(f))
                 
-                for i, (_, row) in enumerate(df.iterrows()):
-                    startup = {
+                startups = [
+                    {
                         "name": row.get("name", ""),
                         "description": row.get("description", ""),
                         "industry": row.get("industry", ""),
                         "funding": row.get("funding", ""),
                         "location": row.get("location", ""),
-                        "founded": int(row.get("founded", 2020)),
-                        "team_size": int(row.get("team_size", 10)),
+                        "founded": int(row.get("founded") or 2020),
+                        "team_size": int(row.get("team_size") or 10),
                         "source": "csv",
                         "source_id": f"csv_{i:03d}",
                         "content_hash": self._generate_content_hash(
@@ -274,7 +332,8 @@ class StartupIngester:
                         "homepage_url": "",
                         "linkedin_url": ""
                     }
-                    startups.append(startup)
+                    for i, row in enumerate(rows)
+                ]
                 
                 print(f"✅ Loaded {len(startups)} startups from CSV")
                 return startups
@@ -317,40 +376,140 @@ class StartupIngester:
             }
         ]
     
-    def get_embeddings(self, texts: List[str]) -> np.ndarray:
-        """Get embeddings for a list of texts using OpenAI API."""
-        embeddings = []
-        for i, text in enumerate(texts):
-            success = False
-            for attempt in range(3):  # Try up to 3 times
-                try:
-                    print(f"Generating embedding {i+1}/{len(texts)} (attempt {attempt+1})...")
-                    response = self.openai_client.embeddings.create(
-                        model="text-embedding-ada-002",
-                        input=text,
+    def load_embedding_cache(self) -> Dict[str, np.ndarray]:
+        """Load content_hash -> embedding cache, ignoring caches built with another model or size."""
+        if self.embed_cache_path.exists():
+            try:
+                with np.load(self.embed_cache_path) as data:
+                    if str(data["model"]) == EMBEDDING_MODEL and data["vectors"].shape[1] == EMBEDDING_DIM:
+                        return dict(zip(data["hashes"].tolist(), data["vectors"]))
+            except Exception as e:
+                print(f"⚠️  Could not read embedding cache: {e}")
+        return {}
+    
+    def save_embedding_cache(self):
+        """Save embedding cache to disk."""
+        temp_path = self.cache_dir / "embeddings.tmp.npz"
+        np.savez_compressed(
+            temp_path,
+            model=np.array(EMBEDDING_MODEL),
+            hashes=np.array(list(self.embed_cache.keys())),
+            vectors=np.array(list(self.embed_cache.values()), dtype=np.float32).reshape(-1, EMBEDDING_DIM)
+        )
+        os.replace(temp_path, self.embed_cache_path)
+    
+    def get_embeddings(self, texts: List[str], content_hashes: Optional[List[str]] = None) -> np.ndarray:
+        """
+        Get embeddings for a list of texts.
+        
+        When content_hashes are given, texts whose hash is already cached are not
+        re-embedded, and the cache is rewritten to hold exactly this corpus.
+        """
+        if content_hashes is None:
+            return self._embed_texts(texts)
+        
+        misses = [i for i, content_hash in enumerate(content_hashes) if content_hash not in self.embed_cache]
+        print(f"♻️  Reusing {len(texts) - len(misses)} cached embeddings, embedding {len(misses)} new texts")
+        
+        embeddings = np.zeros((len(texts), EMBEDDING_DIM), dtype=np.float32)
+        for i, content_hash in enumerate(content_hashes):
+            if content_hash in self.embed_cache:
+                embeddings[i] = self.embed_cache[content_hash]
+        if misses:
+            embeddings[misses] = self._embed_texts([texts[i] for i in misses])
+        
+        # Drop stale entries and never cache zero-vector fallbacks
+        self.embed_cache = {
+            content_hash: embeddings[i]
+            for i, content_hash in enumerate(content_hashes)
+            if embeddings[i].any()
+        }
+        self.save_embedding_cache()
+        return embeddings
+    
+    def _embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Get embeddings for a list of texts using OpenAI API, batched per request."""
+        # Batches write their rows in place; rows of failed batches stay as zero-vector fallbacks
+        embeddings = np.zeros((len(texts), EMBEDDING_DIM), dtype=np.float32)
+        asyncio.run(self._embed_batches(texts, embeddings))
+        return embeddings
+    
+    async def _embed_batches(self, texts: List[str], out: np.ndarray):
+        """Embed all batches concurrently, keeping at most EMBEDDING_CONCURRENCY requests in flight."""
+        semaphore = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
+        # One pooled connection per concurrent batch, kept alive across batches
+        limits = httpx.Limits(max_keepalive_connections=EMBEDDING_CONCURRENCY, max_connections=EMBEDDING_CONCURRENCY)
+        async with openai.AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=httpx.AsyncClient(limits=limits)
+        ) as client:
+            await asyncio.gather(*(
+                self._embed_batch(client, semaphore, texts, start, out)
+                for start in range(0, len(texts), EMBEDDING_BATCH_SIZE)
+            ))
+    
+    async def _embed_batch(self, client: openai.AsyncOpenAI, semaphore: asyncio.Semaphore,
+                           texts: List[str], start: int, out: np.ndarray):
+        """Embed one batch into its rows of out, retrying with jittered exponential backoff."""
+        batch = texts[start:start + EMBEDDING_BATCH_SIZE]
+        end = start + len(batch)
+        for attempt in range(3):  # Try up to 3 times
+            try:
+                async with semaphore:
+                    print(f"Generating embeddings {start+1}-{end}/{len(texts)} (attempt {attempt+1})...")
+                    response = await client.embeddings.create(
+                        model=EMBEDDING_MODEL,
+                        input=batch,
+                        **EMBEDDING_OPTIONS,
+                        encoding_format="base64",  # Raw float32 bytes instead of JSON decimals
                         timeout=60  # Increase timeout to 60 seconds
                     )
-                    embeddings.append(response.data[0].embedding)
-                    success = True
-                    if (i + 1) % 5 == 0:
-                        print(f"✅ Generated embeddings for {i + 1}/{len(texts)} texts...")
-                    break
-                except Exception as e:
-                    print(f"⚠️  Attempt {attempt+1} failed for text {i}: {e}")
-                    if attempt < 2:  # Not the last attempt
-                        wait_time = (2 ** attempt) * 5  # 5s, 10s, 20s
-                        print(f"⏳ Waiting {wait_time}s before retry...")
-                        time.sleep(wait_time)
-                    else:
-                        print(f"❌ All attempts failed for text {i}, using fallback embedding")
-                        # Use zero vector as fallback
-                        embeddings.append([0.0] * 1536)  # OpenAI ada-002 dimension
-        
-        return np.array(embeddings)
+                # Response items carry their input position
+                for d in response.data:
+                    out[start + d.index] = np.frombuffer(base64.b64decode(d.embedding), dtype=np.float32)
+                print(f"✅ Generated embeddings for texts {start+1}-{end}/{len(texts)}")
+                return
+            except Exception as e:
+                print(f"⚠️  Attempt {attempt+1} failed for texts {start}-{end - 1}: {e}")
+                if attempt < 2:  # Not the last attempt
+                    base = (2 ** attempt) * 5  # 5s, 10s
+                    # Jitter so concurrent batches hitting a 429 don't retry in lockstep
+                    wait_time = base + random.uniform(0, base)
+                    print(f"⏳ Waiting {wait_time:.1f}s before retry...")
+                    await asyncio.sleep(wait_time)
+                else:
+                    print(f"❌ All attempts failed for texts {start}-{end - 1}, using fallback embeddings")
+    
+    def build_index(self, embeddings: np.ndarray) -> faiss.Index:
+        """Build an inner-product FAISS index sized for the corpus."""
+        num_vectors, dimension = embeddings.shape
+        if num_vectors < IVF_MIN_VECTORS:
+            # Exhaustive scan is fast enough for small corpora; fp16 storage halves the
+            # bytes scanned per query with negligible loss on normalized embeddings
+            index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT)
+            index.train(embeddings)  # No-op for fp16, kept for a uniform build path
+        else:
+            # Voronoi cells prune the scan to nprobe of nlist cells per query
+            nlist = int(4 * math.sqrt(num_vectors))
+            pq_m = dimension // 32  # One PQ sub-quantizer per 32 dimensions
+            if num_vectors < PQ_MIN_VECTORS:
+                # Uncompressed vectors in each cell
+                factory = f"IVF{nlist},Flat"
+            else:
+                # 4-bit fast-scan PQ packs codes so distances are computed with
+                # SIMD table lookups (AVX2/AVX-512 kernels)
+                factory = f"IVF{nlist},PQ{pq_m}x4fs"
+            simd = faiss.SIMDConfig.get_level_name() if hasattr(faiss, "SIMDConfig") else faiss.get_compile_options()
+            print(f"🧩 Training {factory} index on {num_vectors} vectors (SIMD: {simd})...")
+            index = faiss.index_factory(dimension, factory, faiss.METRIC_INNER_PRODUCT)
+            index.train(embeddings)
+        index.add(embeddings)
+        return index
     
-    def create_search_text(self, startup: Dict[str, Any]) -> str:
-        """Create searchable text from startup data."""
-        return f"{startup['name']} {startup['description']} {startup['industry']} {startup['location']}"
+    def create_search_texts(self, startups: List[Dict[str, Any]]) -> List[str]:
+        """Create searchable text for every startup in one pass of C-level map/join."""
+        # Coerce like an f-string would: short CSV rows carry None and API rows may carry numbers
+        return [" ".join(map(str, fields)) for fields in map(_search_text_fields, startups)]
     
     def ingest(self, force_refresh: bool = False):
         """Main ingestion process."""
@@ -375,54 +534,69 @@ class StartupIngester:
         
         # Create searchable text
         print("🔍 Creating searchable text...")
-        search_texts = [self.create_search_text(startup) for startup in startups]
+        search_texts = self.create_search_texts(startups)
         
         # Generate embeddings
         print("🧠 Generating embeddings...")
-        embeddings = self.get_embeddings(search_texts)
+        embeddings = self.get_embeddings(search_texts, [startup["content_hash"] for startup in startups])
         
         # Create FAISS index
         print("🔧 Creating FAISS index...")
-        dimension = embeddings.shape[1]
-        index = faiss.IndexFlatIP(dimension)  # Inner product for cosine similarity
-        index.add(embeddings.astype('float32'))
+        # get_embeddings already returns contiguous float32, which FAISS takes without a copy
+        assert embeddings.dtype == np.float32 and embeddings.flags.c_contiguous
+        faiss.normalize_L2(embeddings)  # Unit vectors make inner product equal cosine
+        index = self.build_index(embeddings)
         
         # Save to temporary files first
         print("💾 Saving index and metadata...")
         temp_index_path = self.index_dir / "faiss.tmp.index"
         temp_meta_path = self.index_dir / "meta.tmp.jsonl"
+        temp_parquet_path = self.index_dir / "meta.tmp.parquet"
+        temp_embeddings_path = self.index_dir / "embeddings.tmp.f32"
         
         # Save FAISS index
         faiss.write_index(index, str(temp_index_path))
         
+        # Save raw normalized vectors for exact rescoring; shape goes in state.json
+        embeddings.tofile(temp_embeddings_path)
+        
         # Save metadata
-        metadata = []
-        for i, startup in enumerate(startups):
-            metadata.append({
-                "id": i,
-                **startup
-            })
-        
-        with open(temp_meta_path, "w") as f:
+        metadata = [{"id": i, **startup} for i, startup in enumerate(startups)]
+        
+        with open(temp_meta_path, "wb") as f:
             for item in metadata:
-                f.write(json.dumps(item) + "\n")
+                f.write(orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE))
+        
+        # Columnar copy for fast loading; row order is the id
+        pq.write_table(pa.Table.from_pylist(metadata), str(temp_parquet_path))
+        
+        # Recorded in state.json so the API can key its calibration cache without rereading the index
+        index_hash = self._hash_file(temp_index_path)
         
         # Atomic swap
         import shutil
         shutil.move(str(temp_index_path), str(self.index_dir / "faiss.index"))
         shutil.move(str(temp_meta_path), str(self.index_dir / "meta.jsonl"))
+        shutil.move(str(temp_parquet_path), str(self.index_dir / "meta.parquet"))
+        shutil.move(str(temp_embeddings_path), str(self.index_dir / "embeddings.f32"))
+        # Calibration stats belong to the old index; the API rebuilds them on next load
+        for stats_path in self.index_dir.glob("bg_*.npz"):
+            stats_path.unlink(missing_ok=True)
         
         # Update state
         new_state = {
             "last_sync_iso": datetime.now(timezone.utc).isoformat(),
             "total_docs": len(startups),
+            "embedding_model": EMBEDDING_MODEL,
+            "embedding_dim": int(embeddings.shape[1]),
+            "index_hash": index_hash,
             "last_update": datetime.now(timezone.utc).isoformat()
         }
         self.save_sync_state(new_state)
         
         print(f"✅ Successfully ingested {len(startups)} startups")
         print(f"📁 Index saved to: {self.index_dir / 'faiss.index'}")
-        print(f"📄 Metadata saved to: {self.index_dir / 'meta.jsonl'}")
+        print(f"📄 Metadata saved to: {self.index_dir / 'meta.jsonl'} and {self.index_dir / 'meta.parquet'}")
         print(f"🔄 Next scheduled update: 12 hours from now")
         
         return startups
@@ -437,13 +611,16 @@ class StartupIngester:
     
     def start_background_updates(self):
         """Start background scheduler for automatic updates."""
+        if self.scheduler is None:
+            self.scheduler = BackgroundScheduler()
+            self.scheduler.add_job(self.run_scheduled_update, 'interval', hours=12, coalesce=True, misfire_grace_time=3600)
         if not self.scheduler.running:
             self.scheduler.start()
             print("🔄 Background updates started (every 12 hours)")
     
     def stop_background_updates(self):
         """Stop background scheduler."""
-        if self.scheduler.running:
+        if self.scheduler is not None and self.scheduler.running:
             self.scheduler.shutdown()
             print("⏹️  Background updates stopped")
 
@@ -1,8 +1,10 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from typing import List, Optional, Dict, Any
 
 class SearchResult(BaseModel):
     """Model for search result."""
+    model_config = ConfigDict(frozen=True, extra='ignore')
+    
     id: int
     name: str
     description: str
@@ -27,6 +29,9 @@ class SearchResult(BaseModel):
     linkedin_url: Optional[str] = None
     rank: int = Field(..., description="Rank in search results")
 
+# Validates and serializes a whole result list in one compiled pass
+SearchResultList = TypeAdapter(List[SearchResult])
+
 class AskResponse(BaseModel):
     """Model for Q&A response."""
     question: str
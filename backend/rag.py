@@ -1,23 +1,92 @@
 import numpy as np
 import json
+import orjson
 import os
+import re
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any
 import openai
+import httpx
 from dotenv import load_dotenv
 import faiss
-from scipy.stats import norm
+import xxhash
+import pyarrow.parquet as pq
 from scipy.special import expit
 
 # Load environment variables
 load_dotenv()
 
+# Fixed seed so calibrated percentages are reproducible across restarts
+BACKGROUND_SEED = 42
+
+# With exact vectors mapped, fetch this many times top_k candidates from the
+# compressed index and rerank them, recovering neighbours its codes rank too low
+RERANK_OVERFETCH = 8
+
+# Model of indexes whose state.json predates recording it
+LEGACY_EMBEDDING_MODEL = "text-embedding-ada-002"
+
+def row_norms(x: np.ndarray) -> np.ndarray:
+    """L2 norm of each row as an (N, 1) column; one einsum pass, no np.linalg dispatch."""
+    return np.sqrt(np.einsum("ij,ij->i", x, x))[:, None]
+
+_openai_client = None
+
+def faiss_simd_level() -> str:
+    """Name the SIMD level faiss is running its kernels at."""
+    # Dynamic-dispatch builds pick a level at runtime and expose it via SIMDConfig;
+    # older wheels ship one library per level and name theirs in the compile options
+    if hasattr(faiss, "SIMDConfig"):
+        return faiss.SIMDConfig.get_level_name()
+    simd = [opt for opt in faiss.get_compile_options().split() if opt.startswith("AVX")]
+    return ", ".join(simd) or "generic"
+
+def get_openai_client() -> openai.OpenAI:
+    """Return the process-wide OpenAI client, so every request reuses pooled TCP/TLS connections."""
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = openai.OpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            # HTTP/2 multiplexes concurrent worker-thread requests over kept-alive connections
+            http_client=httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+                timeout=30.0
+            )
+        )
+    return _openai_client
+
 class RAGPipeline:
+    # Metadata fields copied into each search result
+    RESULT_FIELDS = ("id", "name", "description", "industry", "location", "funding", "founded", "team_size")
+    INT_FIELDS = ("id", "founded", "team_size")
+    # Metadata fields whose words can explain a match
+    MATCH_FIELDS = ("name", "description", "industry", "location")
+    WORD_PATTERN = re.compile(r"\w+")
+    # One block of LLM context per retrieved startup
+    CONTEXT_TEMPLATE = (
+        "Startup: {name}\n"
+        "Description: {description}\n"
+        "Industry: {industry}\n"
+        "Location: {location}\n"
+        "Funding: {funding}\n"
+        "Founded: {founded}\n"
+        "Team Size: {team_size}\n"
+    )
+    
     def __init__(self):
-        self.openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.openai_client = get_openai_client()
         self.index_dir = Path("index")
         self.index = None
-        self.metadata = []
+        # Metadata as one array per field (struct of arrays), indexed by FAISS id
+        self.columns: Dict[str, np.ndarray] = {}
+        self.num_startups = 0
+        self.tokens: List[frozenset] = []  # Lowercased words of MATCH_FIELDS, per startup
+        self.embeddings = None  # Memory-mapped (N, d) float32 matrix, when ingest saved one
+        self._bg_stats = (0.0, 1.0)  # Background (mu_0, sigma_0) for score calibration
+        # Queries must be embedded exactly like the indexed startups; set from state.json
+        self.embedding_model = LEGACY_EMBEDDING_MODEL
+        self.embedding_options: Dict[str, Any] = {}
         self._load_index()
     
     def _load_index(self):
@@ -25,25 +94,94 @@ class RAGPipeline:
         try:
             index_path = self.index_dir / "faiss.index"
             meta_path = self.index_dir / "meta.jsonl"
+            parquet_path = self.index_dir / "meta.parquet"
             
-            if index_path.exists() and meta_path.exists():
-                self.index = faiss.read_index(str(index_path))
+            if index_path.exists() and (parquet_path.exists() or meta_path.exists()):
+                self.index = self._read_index(index_path)
                 
-                # Load metadata
-                self.metadata = []
-                with open(meta_path, "r") as f:
-                    for line in f:
-                        self.metadata.append(json.loads(line.strip()))
+                # IVF indexes only scan nprobe cells per query: the recall/speed knob
+                ivf = faiss.try_extract_index_ivf(self.index)
+                if ivf is not None:
+                    ivf.nprobe = max(16, ivf.nlist // 32)
                 
-                print(f"✅ Loaded index with {len(self.metadata)} startups")
+                # Load metadata, preferring the columnar copy written by newer ingests
+                if parquet_path.exists():
+                    table = pq.read_table(str(parquet_path), columns=list(self.RESULT_FIELDS), memory_map=True)
+                    values = {field: table.column(field).to_pylist() for field in self.RESULT_FIELDS}
+                else:
+                    with open(meta_path, "rb") as f:
+                        data = f.read()
+                    rows = [orjson.loads(line) for line in data.splitlines() if line]
+                    values = {field: [row[field] for row in rows] for field in self.RESULT_FIELDS}
+                
+                self.columns = {
+                    field: np.array(values[field], dtype=np.int32 if field in self.INT_FIELDS else object)
+                    for field in self.RESULT_FIELDS
+                }
+                self.num_startups = len(self.columns["id"])
+                self.tokens = self._tokenize_metadata()
+                state = self._read_state()
+                self._configure_embeddings(state)
+                self.embeddings = self._map_embeddings(state)
+                self._bg_stats = self._load_background_stats(state)
+                
+                # Report the active kernels so a fallback to the generic path is visible
+                print(f"✅ Loaded index with {self.num_startups} startups (SIMD: {faiss_simd_level()})")
             else:
                 print("⚠️  Index not found. Run ingest.py first.")
         except Exception as e:
             print(f"❌ Error loading index: {e}")
     
+    def _tokenize_metadata(self) -> List[frozenset]:
+        """Precompute the word set of every startup, so matching a query is a set intersection."""
+        return [
+            frozenset(self.WORD_PATTERN.findall(" ".join(map(str, values)).lower()))
+            for values in zip(*(self.columns[field] for field in self.MATCH_FIELDS))
+        ]
+    
+    def _read_index(self, index_path: Path) -> faiss.Index:
+        """
+        Read the FAISS index memory-mapped, so cold pages stay on disk and workers
+        share the page cache; fall back to a full read if this index type or
+        FAISS build can't be mapped.
+        """
+        try:
+            return faiss.read_index(str(index_path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError as e:
+            print(f"⚠️  Could not memory-map index, loading into RAM: {e}")
+            return faiss.read_index(str(index_path))
+    
+    def _read_state(self) -> Dict[str, Any]:
+        """Read the ingest state written alongside the index, if any."""
+        state_path = self.index_dir / "state.json"
+        if not state_path.exists():
+            return {}
+        with open(state_path, "r") as f:
+            return json.load(f)
+    
+    def _configure_embeddings(self, state: Dict[str, Any]):
+        """Embed queries with the same model and output size the index was built with."""
+        self.embedding_model = state.get("embedding_model", LEGACY_EMBEDDING_MODEL)
+        if self.embedding_model.startswith("text-embedding-3"):
+            self.embedding_options = {"dimensions": self.index.d}
+        else:
+            self.embedding_options = {}
+    
+    def _map_embeddings(self, state: Dict[str, Any]):
+        """Memory-map the raw embedding matrix so only the rows that are read get paged in."""
+        embeddings_path = self.index_dir / "embeddings.f32"
+        if not (embeddings_path.exists() and state):
+            return None
+        
+        shape = (state.get("total_docs", 0), state.get("embedding_dim", 0))
+        # Skip files from an older ingest that don't line up with this index
+        if shape[0] != self.num_startups or embeddings_path.stat().st_size != shape[0] * shape[1] * 4:
+            return None
+        return np.memmap(embeddings_path, dtype=np.float32, mode="r", shape=shape)
+    
     def is_index_loaded(self) -> bool:
         """Check if index is loaded."""
-        return self.index is not None and len(self.metadata) > 0
+        return self.index is not None and self.num_startups > 0
     
     def _build_background_distribution(self) -> tuple[float, float]:
         """
@@ -54,62 +192,79 @@ class RAGPipeline:
             return 0.0, 1.0
         
         # Generate random query-like embeddings to establish baseline
-        num_samples = min(100, len(self.metadata) * 2)  # Reasonable sample size
-        random_embeddings = np.random.randn(num_samples, 1536).astype('float32')
+        num_samples = min(100, self.num_startups * 2)  # Reasonable sample size
+        rng = np.random.default_rng(seed=BACKGROUND_SEED)
+        random_embeddings = rng.standard_normal((num_samples, self.index.d), dtype=np.float32)
         
         # Normalize to unit vectors (like real embeddings)
-        random_embeddings = random_embeddings / np.linalg.norm(random_embeddings, axis=1, keepdims=True)
+        random_embeddings /= row_norms(random_embeddings)
         
-        # Search with random embeddings to get background scores
-        background_scores = []
-        for i in range(0, num_samples, 10):  # Process in batches
-            batch = random_embeddings[i:i+10]
-            if len(batch) > 0:
-                scores, _ = self.index.search(batch, 5)  # Get top 5 for each random query
-                background_scores.extend(scores.flatten())
+        # Search all random embeddings in one call to get background scores (top 5 each)
+        # Scored exactly like real queries, so mu_0/sigma_0 match what they calibrate
+        scores, indices = self._search_index(random_embeddings, 5)
+        scores = scores[indices >= 0]
         
         # Calculate background distribution parameters
-        mu_0 = float(np.mean(background_scores))
-        sigma_0 = float(np.std(background_scores))
+        mu_0 = float(scores.mean())
+        sigma_0 = float(scores.std())
         
         print(f"📊 Background distribution: μ₀={mu_0:.4f}, σ₀={sigma_0:.4f}")
         return mu_0, sigma_0
     
-    def _calibrate_score(self, raw_score: float, mu_0: float, sigma_0: float) -> float:
+    def _load_background_stats(self, state: Dict[str, Any]) -> tuple[float, float]:
+        """
+        Load the background distribution cached next to the index.
+        The cache file is keyed by a hash of the index file, so a rebuilt index
+        never reuses stats from the one it replaced.
+        """
+        # Ingest records the hash; only indexes older than that need hashing here
+        index_hash = state.get("index_hash") or self._index_hash()
+        stats_path = self.index_dir / f"bg_{index_hash}.npz"
+        if stats_path.exists():
+            try:
+                with np.load(stats_path) as stats:
+                    return float(stats["mu_0"]), float(stats["sigma_0"])
+            except Exception as e:
+                print(f"⚠️  Ignoring unreadable background cache, rebuilding: {e}")
+        
+        mu_0, sigma_0 = self._build_background_distribution()
+        # Other workers may load the file at any moment, so publish it with an atomic rename
+        temp_path = stats_path.with_suffix(f".{os.getpid()}.tmp.npz")
+        try:
+            np.savez(temp_path, mu_0=mu_0, sigma_0=sigma_0)
+            os.replace(temp_path, stats_path)
+        except OSError as e:
+            temp_path.unlink(missing_ok=True)
+            print(f"⚠️  Could not cache background distribution: {e}")
+        return mu_0, sigma_0
+    
+    def _index_hash(self) -> str:
+        """Hash the FAISS index file in chunks, without holding it in memory."""
+        hasher = xxhash.xxh3_64()
+        with open(self.index_dir / "faiss.index", "rb") as f:
+            while chunk := f.read(1 << 20):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+    
+    def _calibrate_scores(self, z_scores: np.ndarray) -> np.ndarray:
         """
-        Calibrate raw similarity score using z-score normalization and logistic squashing.
+        Calibrate z-scores of raw similarity scores with a logistic squash, vectorized.
         
         Args:
-            raw_score: Raw FAISS similarity score
-            mu_0: Background distribution mean
-            sigma_0: Background distribution standard deviation
+            z_scores: (raw_score - mu_0) / sigma_0 for each result
             
         Returns:
-            Calibrated score in [0, 100] range
+            Calibrated scores in [0, 100] range
         """
-        # Step 2: Calculate z-score
-        z_score = (raw_score - mu_0) / sigma_0 if sigma_0 > 0 else 0
-        
-        # Step 3: Create much more dramatic score variation
-        # Use aggressive scaling to create better separation
-        
-        # Scale down z-score dramatically since they're very high
-        scaled_z = z_score / 15.0  # Scale down by factor of 15
-        
-        if scaled_z > 2.5:  # Very high relevance
-            calibrated_score = 90 + (scaled_z - 2.5) * 4.0  # 90-100 range
-        elif scaled_z > 2.0:  # High relevance
-            calibrated_score = 80 + (scaled_z - 2.0) * 20.0  # 80-90 range
-        elif scaled_z > 1.5:  # Good relevance
-            calibrated_score = 65 + (scaled_z - 1.5) * 30.0  # 65-80 range
-        elif scaled_z > 1.0:  # Moderate relevance
-            calibrated_score = 45 + (scaled_z - 1.0) * 40.0  # 45-65 range
-        elif scaled_z > 0.5:  # Low relevance
-            calibrated_score = 20 + (scaled_z - 0.5) * 50.0  # 20-45 range
-        else:  # Very low relevance
-            calibrated_score = max(0, scaled_z * 40.0)  # 0-20 range
-        
-        return max(0.0, min(100.0, calibrated_score))
+        # Scale down z-score dramatically since they're very high, then center the
+        # smooth, branchless ramp where the old piecewise scale hit "moderate" (~55).
+        # Every step after the first runs in place, so only one array is allocated.
+        calibrated_scores = z_scores / 15.0  # Scale down by factor of 15
+        calibrated_scores -= 1.25
+        calibrated_scores *= 3.0
+        expit(calibrated_scores, out=calibrated_scores)
+        calibrated_scores *= 100.0
+        return calibrated_scores
     
     def _get_score_interpretation(self, calibrated_score: float) -> tuple[str, str]:
         """
@@ -136,13 +291,24 @@ class RAGPipeline:
         else:
             return "Poor Match", "🔴"
     
-    def get_embedding(self, text: str) -> np.ndarray:
-        """Get embedding for a single text."""
+    def get_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Get embeddings for a list of texts in a single API request."""
         response = self.openai_client.embeddings.create(
-            model="text-embedding-ada-002",
-            input=text
+            model=self.embedding_model,
+            **self.embedding_options,
+            input=texts
         )
-        return np.array(response.data[0].embedding)
+        embeddings = np.array([d.embedding for d in response.data], dtype=np.float32)
+        
+        # Unit-normalize once here, to match the normalized vectors in the index
+        norms = row_norms(embeddings)
+        norms[norms == 0] = 1.0
+        embeddings /= norms
+        return embeddings
+    
+    def get_embedding(self, text: str) -> np.ndarray:
+        """Get embedding for a single text."""
+        return self.get_embeddings([text])[0]
     
     def search(self, query: str, top_k: int = 10) -> List[Dict[str, Any]]:
         """
@@ -155,74 +321,121 @@ class RAGPipeline:
         Returns:
             List of startup data with calibrated similarity scores
         """
+        return self.search_batch([query], top_k=top_k)[0]
+    
+    def search_batch(self, queries: List[str], top_k: int = 10) -> List[List[Dict[str, Any]]]:
+        """
+        Search for several queries at once: one embeddings request, one FAISS search
+        and one calibration pass over all of them.
+        
+        Args:
+            queries: Search queries
+            top_k: Number of results to return per query
+            
+        Returns:
+            One list of startup data with calibrated similarity scores per query
+        """
         if not self.is_index_loaded():
             raise Exception("Index not loaded. Run ingest.py first.")
         
-        # Step 1: Build background distribution for calibration
-        print("🔧 Building background similarity distribution...")
-        mu_0, sigma_0 = self._build_background_distribution()
+        # Step 1: Background distribution for calibration (built once per index)
+        mu_0, sigma_0 = self._bg_stats
         
-        # Get query embedding
-        query_embedding = self.get_embedding(query)
-        query_embedding = query_embedding.reshape(1, -1).astype('float32')
+        # Get query embeddings, already unit-length float32 of shape (B, d)
+        query_embeddings = self.get_embeddings(queries)
         
         # Search in FAISS index
-        scores, indices = self.index.search(query_embedding, top_k)
+        scores, indices = self._search_index(query_embeddings, top_k)
+        
+        # Step 2 & 3: z-score and calibrate all B x top_k raw scores at once
+        z_scores = scores - mu_0
+        if sigma_0 > 0:
+            z_scores /= sigma_0
+        else:
+            z_scores[:] = 0.0
+        calibrated_scores = self._calibrate_scores(z_scores)
         
-        # Ensure scores and indices are Python native types
-        scores = scores.tolist() if hasattr(scores, 'tolist') else scores
-        indices = indices.tolist() if hasattr(indices, 'tolist') else indices
+        results = [
+            self._format_results(query, scores[b], z_scores[b], calibrated_scores[b], indices[b], mu_0, sigma_0)
+            for b, query in enumerate(queries)
+        ]
+        
+        print(f"🎯 Calibrated {sum(map(len, results))} results using background distribution")
+        return results
+    
+    def _search_index(self, query_embeddings: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Search the index for the k best hits per query, scored exactly when possible.
+        
+        The index may hold fp16 or PQ codes, so with the raw vectors mapped an
+        over-fetched candidate set is rescored against them and the best k kept.
+        Padded hits (id -1) get a score of -inf.
+        """
+        if self.embeddings is None:
+            scores, indices = self.index.search(query_embeddings, k)
+            # Padded hits score -FLT_MAX, which overflows when z-scored; -inf does not
+            scores[indices < 0] = -np.inf
+            return scores, indices
+        
+        num_candidates = max(k, min(self.index.ntotal, k * RERANK_OVERFETCH))
+        _, indices = self.index.search(query_embeddings, num_candidates)
+        hit_vectors = self.embeddings[np.where(indices >= 0, indices, 0)]  # (B, num_candidates, d)
+        scores = np.einsum("bkd,bd->bk", hit_vectors, query_embeddings)
+        scores[indices < 0] = -np.inf
+        order = np.argsort(-scores, axis=1)[:, :k]
+        return np.take_along_axis(scores, order, axis=1), np.take_along_axis(indices, order, axis=1)
+    
+    def _format_results(self, query: str, scores: np.ndarray, z_scores: np.ndarray,
+                        calibrated_scores: np.ndarray, ids: np.ndarray,
+                        mu_0: float, sigma_0: float) -> List[Dict[str, Any]]:
+        """Assemble result dicts for one query's ranked hits."""
+        # Drop the -1 ids IVF pads missing hits with
+        valid = (ids >= 0) & (ids < self.num_startups)
+        ids = ids[valid]
+        
+        # Gather each result field with one fancy-indexing pass per column; .tolist()
+        # converts to Python native types once, so every field below is JSON-ready
+        fields = {field: self.columns[field][ids].tolist() for field in self.RESULT_FIELDS}
+        scores = scores[valid].tolist()
+        z_scores = z_scores[valid].tolist()
+        calibrated_scores = calibrated_scores[valid].tolist()
+        ids = ids.tolist()
+        
+        query_terms = frozenset(self.WORD_PATTERN.findall(query.lower()))
         
         # Format results with calibrated scoring
         results = []
-        for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-            if idx < len(self.metadata):
-                startup_data = self.metadata[idx].copy()
-                
-                # Step 2 & 3: Calibrate the raw score
-                raw_score = float(score)
-                calibrated_score = self._calibrate_score(raw_score, mu_0, sigma_0)
-                
-                # Get score interpretation
-                score_label, score_color = self._get_score_interpretation(calibrated_score)
-                
-                # Store both raw and calibrated scores (ensure Python native types)
-                startup_data["similarity_score"] = float(raw_score)
-                startup_data["similarity_percentage"] = float(round(calibrated_score, 1))
-                startup_data["similarity_label"] = str(score_label)
-                startup_data["similarity_color"] = str(score_color)
-                startup_data["calibration_info"] = {
-                    "z_score": float(round((raw_score - mu_0) / sigma_0, 3) if sigma_0 > 0 else 0),
-                    "background_mean": float(round(mu_0, 4)),
-                    "background_std": float(round(sigma_0, 4))
-                }
-                startup_data["rank"] = int(i + 1)
-                
-                # Create explanation of why this startup matched
-                startup_text = f"{startup_data['name']} {startup_data['description']} {startup_data['industry']} {startup_data['location']}".lower()
-                query_terms = query.lower().split()
-                matching_terms = [term for term in query_terms if term in startup_text]
-                
-                if matching_terms:
-                    startup_data["match_reason"] = str(f"Matched on: {', '.join(set(matching_terms))}")
-                else:
-                    startup_data["match_reason"] = str("Semantic similarity match")
-                
-                # Ensure all numeric fields are Python native types
-                startup_data["id"] = int(startup_data["id"])
-                startup_data["founded"] = int(startup_data["founded"])
-                startup_data["team_size"] = int(startup_data["team_size"])
-                
-                # Final safety check: convert any remaining numpy types
-                for key, value in startup_data.items():
-                    if hasattr(value, 'item'):  # numpy scalar
-                        startup_data[key] = value.item()
-                    elif hasattr(value, 'tolist'):  # numpy array
-                        startup_data[key] = value.tolist()
-                
-                results.append(startup_data)
+        for i, (score, idx) in enumerate(zip(scores, ids)):
+            startup_data = {field: fields[field][i] for field in self.RESULT_FIELDS}
+            
+            raw_score = float(score)
+            calibrated_score = calibrated_scores[i]
+            
+            # Get score interpretation
+            score_label, score_color = self._get_score_interpretation(calibrated_score)
+            
+            # Store both raw and calibrated scores (ensure Python native types)
+            startup_data["similarity_score"] = float(raw_score)
+            startup_data["similarity_percentage"] = float(round(calibrated_score, 1))
+            startup_data["similarity_label"] = str(score_label)
+            startup_data["similarity_color"] = str(score_color)
+            startup_data["calibration_info"] = {
+                "z_score": float(round(z_scores[i], 3)),
+                "background_mean": float(round(mu_0, 4)),
+                "background_std": float(round(sigma_0, 4))
+            }
+            startup_data["rank"] = int(i + 1)
+            
+            # Create explanation of why this startup matched
+            matching_terms = query_terms & self.tokens[idx]
+            
+            if matching_terms:
+                startup_data["match_reason"] = str(f"Matched on: {', '.join(sorted(matching_terms))}")
+            else:
+                startup_data["match_reason"] = str("Semantic similarity match")
+            
+            results.append(startup_data)
         
-        print(f"🎯 Calibrated {len(results)} results using background distribution")
         return results
     
     def ask(self, question: str, top_k: int = 3) -> str:
@@ -236,6 +449,19 @@ class RAGPipeline:
         Returns:
             LLM-generated answer
         """
+        return "".join(self.ask_stream(question, top_k=top_k))
+    
+    def ask_stream(self, question: str, top_k: int = 3) -> Iterator[str]:
+        """
+        Stream the LLM answer as it is generated.
+        
+        Args:
+            question: User question
+            top_k: Number of startups to retrieve for context
+            
+        Yields:
+            Chunks of the LLM-generated answer
+        """
         if not self.is_index_loaded():
             raise Exception("Index not loaded. Run ingest.py first.")
         
@@ -243,7 +469,8 @@ class RAGPipeline:
         search_results = self.search(question, top_k=top_k)
         
         if not search_results:
-            return "I couldn't find any relevant startup information to answer your question."
+            yield "I couldn't find any relevant startup information to answer your question."
+            return
         
         # Create context from retrieved startups
         context = self._create_context(search_results)
@@ -258,25 +485,17 @@ class RAGPipeline:
                 {"role": "user", "content": prompt}
             ],
             max_tokens=500,
-            temperature=0.7
+            temperature=0.7,
+            stream=True
         )
         
-        return response.choices[0].message.content
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
     
     def _create_context(self, search_results: List[Dict[str, Any]]) -> str:
         """Create context string from search results."""
-        context_parts = []
-        for result in search_results:
-            context_parts.append(
-                f"Startup: {result['name']}\n"
-                f"Description: {result['description']}\n"
-                f"Industry: {result['industry']}\n"
-                f"Location: {result['location']}\n"
-                f"Funding: {result['funding']}\n"
-                f"Founded: {result['founded']}\n"
-                f"Team Size: {result['team_size']}\n"
-            )
-        return "\n".join(context_parts)
+        return "\n".join(self.CONTEXT_TEMPLATE.format_map(result) for result in search_results)
     
     def _create_qa_prompt(self, question: str, context: str) -> str:
         """Create prompt for Q&A."""